@@ -0,0 +1,113 @@
+import json
+import random
+from typing import Dict, List
+
+# candidate generation strategies of the smart solver
+STRATEGIES = ["basic", "random", "best", "levenshtein"]
+
+
+class StrategyAllocator:
+    """
+    Class for a bandit allocation of the candidate budget between strategies.
+
+    Description:
+    The StrategyAllocator class keeps a discounted success/failure count for every candidate generation
+    strategy, each guessed word crediting the strategy that produced it. A strategy without enough credits
+    keeps its equal share of the budget, the strategies with enough credits share the rest by Thompson
+    sampling: the more often a strategy wins the draws the bigger its share, with a floor so no strategy
+    is ever fully dropped. The draws use a prior centred on the mean reward of all the strategies, so
+    the rewards are compared to each other rather than to 0.5. The discount makes the allocation follow
+    what works right now. With no credits yet the shares are equal, which gives back the fixed budgets.
+
+    Arguments:
+    strategies (List[str]): Names of the strategies to allocate between.
+    discount (float): Weight kept by the past credits at every round, 1 to never forget.
+    floor (float): Minimal share of every strategy.
+    samples (int): Number of Thompson draws used to estimate the shares.
+    min_credits (float): Discounted number of credits a strategy needs before competing for the budget.
+    prior_strength (float): Weight of the shared prior, in number of credits.
+    """
+
+    def __init__(self, strategies: List[str] = STRATEGIES, discount: float = 0.9, floor: float = 0.05, samples: int = 200,
+                 min_credits: float = 5, prior_strength: float = 2):
+        if floor * len(strategies) > 1: floor = 1 / len(strategies)
+        self.strategies = list(strategies)
+        self.discount = discount
+        self.floor = floor
+        self.samples = samples
+        self.min_credits = min_credits
+        self.prior_strength = prior_strength
+        self.rounds = 0
+        self._successes = {strategy: 0.0 for strategy in self.strategies}
+        self._failures = {strategy: 0.0 for strategy in self.strategies}
+        self._shares = {strategy: 1 / len(self.strategies) for strategy in self.strategies}
+        self._stats = {strategy: {"candidates": 0, "guesses": 0, "improvements": 0, "reward": 0.0} for strategy in self.strategies}
+
+    def allocate(self) -> Dict[str, float]:
+        """
+        Draws the shares of the round, returns a budget multiplier per strategy (1 = equal share)
+        """
+        equal_share = 1 / len(self.strategies)
+        self._shares = {strategy: equal_share for strategy in self.strategies}
+        tried = [strategy for strategy in self.strategies
+                 if self._successes[strategy] + self._failures[strategy] >= self.min_credits]
+        if len(tried) >= 2:
+            successes = sum(self._successes[strategy] for strategy in tried)
+            credits = successes + sum(self._failures[strategy] for strategy in tried)
+            mean = min(max(successes / credits, 0.01), 0.99)
+            wins = {strategy: 0 for strategy in tried}
+            for _ in range(self.samples):
+                draws = {strategy: random.betavariate(self.prior_strength * mean + self._successes[strategy],
+                                                      self.prior_strength * (1 - mean) + self._failures[strategy])
+                         for strategy in tried}
+                wins[max(draws, key=draws.get)] += 1
+            free_share = equal_share * len(tried) - self.floor * len(tried)
+            for strategy in tried:
+                self._shares[strategy] = self.floor + free_share * wins[strategy] / self.samples
+        return {strategy: share * len(self.strategies) for strategy, share in self._shares.items()}
+
+    def propose(self, strategy: str, count: int):
+        """
+        Counts the candidates produced by a strategy
+        """
+        self._stats[strategy]["candidates"] += count
+
+    def credit(self, strategy: str, reward: float, improvement: bool = False):
+        """
+        Credits the score of a guessed word to the strategy that produced it, reward between 0 and 1
+        """
+        reward = min(max(reward, 0.0), 1.0)
+        self._successes[strategy] += reward
+        self._failures[strategy] += 1 - reward
+        self._stats[strategy]["guesses"] += 1
+        self._stats[strategy]["reward"] += reward
+        if improvement: self._stats[strategy]["improvements"] += 1
+
+    def end_round(self):
+        """
+        Discounts the past credits
+        """
+        self.rounds += 1
+        for strategy in self.strategies:
+            self._successes[strategy] *= self.discount
+            self._failures[strategy] *= self.discount
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Yield statistics of every strategy since the start of the solve
+        """
+        stats = {}
+        for strategy in self.strategies:
+            data = dict(self._stats[strategy])
+            data["mean_reward"] = data["reward"] / data["guesses"] if data["guesses"] else 0.0
+            data["improvement_rate"] = data["improvements"] / data["guesses"] if data["guesses"] else 0.0
+            data["share"] = self._shares[strategy]
+            stats[strategy] = data
+        return stats
+
+    def export(self, file_path: str):
+        """
+        Saves the statistics into a json file
+        """
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump({"rounds": self.rounds, "strategies": self.stats()}, file, indent=2)
@@ -0,0 +1,158 @@
+from typing import List
+import numpy as np
+
+
+class ScoreCalibrator:
+    """
+    Class for an online calibration between the game scores and a local word model.
+
+    Description:
+    The ScoreCalibrator class collects the (word, score) pairs given by cemantix and fits a mapping
+    between the game scores and the local model. A monotone curve maps a game score to the cosine
+    the local model would give with the word of the day, the word of the day being estimated as a
+    direction of the local embedding space. In "linear" mode a ridge regressed linear transform of the
+    embedding space is also fitted on that cosine scale, and the candidates are scored with it instead of
+    the estimated direction. The ridge shrinks it a lot with few observations, only its ranking matters.
+    Until enough words are observed the mapping is the identity (score/100), like the old thresholds.
+
+    Arguments:
+    model (KeyedVectors): Local word model, the one used to generate the candidates.
+    mode (str): "curve" for the monotone curve only, "linear" to also fit a linear transform.
+    min_observations (int): Number of observed words needed before the mapping is used.
+    ridge (float): Regularisation of the linear transform.
+    """
+
+    def __init__(self, model, mode: str = "curve", min_observations: int = 20, ridge: float = 1.0):
+        if mode not in ("curve", "linear"):
+            raise ValueError(f"Unknown calibration mode \"{mode}\"")
+        self.model = model
+        self.mode = mode
+        self.min_observations = min_observations
+        self.ridge = ridge
+        self.observations = {}
+        self.correlation = None
+        self._dirty = False
+        self._target = None     # estimated direction of the word of the day
+        self._weights = None    # linear transform, "linear" mode only
+        self._bias = 0.0
+        self._curve_scores = None
+        self._curve_cosines = None
+
+    @property
+    def fitted(self) -> bool:
+        return self._curve_scores is not None
+
+    def observe(self, word: str, score: float):
+        """
+        Adds a word and its game score, words missing from the model are ignored
+        """
+        if word not in self.model or self.observations.get(word) == score:
+            return
+        self.observations[word] = score
+        self._dirty = True
+
+    # Fitting
+    def fit(self) -> bool:
+        """
+        Fits the mapping on all the observed words, returns True if the mapping is usable
+        """
+        if not self._dirty:
+            return self.fitted
+        self._dirty = False
+        if len(self.observations) < self.min_observations:
+            return self.fitted
+
+        words = list(self.observations)
+        scores = np.array([self.observations[word] for word in words], dtype=np.float64)
+        vectors = np.array([self.model.get_vector(word, norm=True) for word in words], dtype=np.float64)
+
+        weights = np.clip(scores, 0, None) ** 2
+        if weights.sum() == 0:
+            return self.fitted
+        target = weights @ vectors
+        self._target = target / np.linalg.norm(target)
+        predicted = vectors @ self._target
+        self._fit_curve(scores, predicted)
+
+        if self.mode == "linear":
+            # alternate between the linear transform and the curve, few rounds are enough
+            design = np.hstack([vectors, np.ones((len(words), 1))])
+            regularisation = self.ridge * np.eye(design.shape[1])
+            regularisation[-1, -1] = 0  # the bias is not regularised
+            for _ in range(3):
+                goal = self.to_cosine(scores)
+                solution = np.linalg.solve(design.T @ design + regularisation, design.T @ goal)
+                self._weights, self._bias = solution[:-1], solution[-1]
+                predicted = vectors @ self._weights + self._bias
+                self._fit_curve(scores, predicted)
+
+        self.correlation = self._rank_correlation(scores, predicted)
+        return True
+
+    def _fit_curve(self, scores: np.ndarray, predicted: np.ndarray):
+        """
+        Isotonic regression (pool adjacent violators) of the local predictions on the game scores
+        """
+        order = np.argsort(scores, kind="stable")
+        blocks = []  # [sum, count, last score]
+        for score, value in zip(scores[order], predicted[order]):
+            blocks.append([value, 1, score])
+            while len(blocks) > 1 and (blocks[-2][2] == blocks[-1][2]
+                                       or blocks[-2][0] / blocks[-2][1] >= blocks[-1][0] / blocks[-1][1]):
+                total, count, last = blocks.pop()
+                blocks[-1][0] += total
+                blocks[-1][1] += count
+                blocks[-1][2] = last
+        self._curve_scores = np.array([last for _, _, last in blocks])
+        self._curve_cosines = np.array([total / count for total, count, _ in blocks])
+
+    def _rank_correlation(self, first: np.ndarray, second: np.ndarray) -> float:
+        if len(first) < 2:
+            return 0.0
+        first_ranks = np.argsort(np.argsort(first)).astype(np.float64)
+        second_ranks = np.argsort(np.argsort(second)).astype(np.float64)
+        if first_ranks.std() == 0 or second_ranks.std() == 0:
+            return 0.0
+        return float(np.corrcoef(first_ranks, second_ranks)[0, 1])
+
+    # Mapping
+    def to_cosine(self, score):
+        """
+        Maps a game score (-100 to 100) to the local cosine scale
+        """
+        if not self.fitted:
+            return score / 100
+        value = np.interp(score, self._curve_scores, self._curve_cosines)
+        return value if np.ndim(score) else float(value)
+
+    def covers(self, score: float) -> bool:
+        """
+        Check if a game score is inside the observed range, outside of it the curve is only clamped
+        """
+        return self.fitted and self._curve_scores[0] <= score <= self._curve_scores[-1]
+
+    def predict(self, word: str) -> float:
+        """
+        Local cosine of a word with the estimated word of the day, None if unknown
+        """
+        if not self.fitted or word not in self.model:
+            return None
+        vector = self.model.get_vector(word, norm=True)
+        if self.mode == "linear" and self._weights is not None:
+            return float(vector @ self._weights + self._bias)
+        return float(vector @ self._target)
+
+    def rank(self, words: List[str]) -> List[str]:
+        """
+        Sorts the candidates from the most to the least promising, unknown words keep their order at the end
+        """
+        if not self.fitted:
+            return words
+        predictions = [self.predict(word) for word in words]
+        known = [(prediction, index) for index, prediction in enumerate(predictions) if prediction is not None]
+        known.sort(key=lambda x: (-x[0], x[1]))
+        return [words[index] for _, index in known] + [word for word, prediction in zip(words, predictions) if prediction is None]
+
+    def status(self) -> str:
+        correlation = "None" if self.correlation is None else '{0:.3f}'.format(self.correlation)
+        return f"mode={self.mode}, observations={len(self.observations)}, fitted={self.fitted}, rank_correlation={correlation}"
@@ -0,0 +1,238 @@
+import argparse
+import json
+import socket
+import socketserver
+import threading
+import time
+
+HOST = "127.0.0.1"
+PORT = 8765
+CALIBRATIONS = ["curve", "linear", "none"]
+BUDGETS = ["adaptive", "fixed"]
+
+
+class CemantixDaemon:
+    """
+    Class for a resident cemantix solver service.
+
+    Description:
+    The CemantixDaemon class keeps the word model, the word lists and a pool of warm browser sessions
+    loaded between runs, and accepts solve and benchmark jobs over a local socket. A job is one JSON line,
+    the progress of the job is streamed back as JSON lines until a "done" or "error" line.
+    Only one job runs at a time since the solvers share the word files, it is cancelled by a "cancel"
+    command, when the client disconnects or when a solve takes longer than the job timeout.
+
+    Arguments:
+    host (str): Address to listen on, keep it local.
+    port (int): Port to listen on.
+    pool_size (int): Number of warm drivers kept ready, should cover the random threads plus the smart one.
+    verbose (int): Verbose argument given to the smart solver.
+    job_timeout (float): Maximum duration of a solve in seconds, None for no limit.
+    """
+
+    def __init__(self, host: str = HOST, port: int = PORT, pool_size: int = 4, verbose: int = 1, job_timeout: float = 3600):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.verbose = verbose
+        self.job_timeout = job_timeout
+        self.pool = None
+        self.server = None
+        self.started = None
+        self.jobs_done = 0
+        self._job_lock = threading.Lock()
+        self._cancel_events = []    # stop and quit events of the running solve
+
+    def _warm_up(self):
+        """
+        Loads the model and the word lists, and starts the warm drivers
+        """
+        global main
+        import main     # loads the french model once for the whole life of the daemon
+        from c_smart import _load_sorted_words
+        from c_pool import CemantixDriverPool
+        try: _load_sorted_words()
+        except FileNotFoundError: pass
+        self.pool = CemantixDriverPool(self.pool_size)
+        self.pool.start()
+
+    # Jobs
+    def _cancel(self):
+        for event in self._cancel_events:
+            event.set()
+
+    def _solve(self, send, threads: int = 3, calibration: str = "curve", adaptive_budget: bool = True):
+        if calibration == "none": calibration = None
+        stop_event = threading.Event()
+        quit_event = threading.Event()
+        self._cancel_events = [stop_event, quit_event]
+        def progress(data):
+            try: send(data)
+            except OSError: self._cancel()    # the client is gone, nobody wants the result anymore
+        try:
+            results = main.main(thread_count=threads, verbose=self.verbose, calibration=calibration,
+                                driver_pool=self.pool, progress=progress, adaptive_budget=adaptive_budget,
+                                stop_event=stop_event, quit_event=quit_event, timeout=self.job_timeout)
+        finally:
+            self._cancel_events = []
+        if not results:
+            raise RuntimeError("The solve failed or was cancelled")
+        word, time_end, guesses, total_guesses, strategies = results
+        return {"word": word, "time": time_end, "guesses": guesses, "total_guesses": total_guesses, "strategies": strategies}
+
+    def _benchmark(self, send, runs: int = 3, threads: int = 3, calibrations = ("curve",), budgets = ("adaptive",)):
+        report = {}
+        for calibration in calibrations:
+            for budget in budgets:
+                solves = []
+                for run in range(runs):
+                    try: send({"event": "benchmark", "calibration": calibration, "budget": budget, "run": run + 1, "runs": runs})
+                    except OSError: raise RuntimeError("The client disconnected")
+                    solves.append(self._solve(send, threads, calibration, budget == "adaptive"))
+                strategies = {}
+                for solve in solves:
+                    for strategy, data in solve["strategies"].items():
+                        total = strategies.setdefault(strategy, {"candidates": 0, "guesses": 0, "improvements": 0})
+                        for key in total:
+                            total[key] += data[key]
+                report[f"{calibration}/{budget}"] = {
+                    "runs": solves,
+                    "mean_time": sum(solve["time"] for solve in solves) / len(solves),
+                    "mean_guesses": sum(solve["guesses"] for solve in solves) / len(solves),
+                    "mean_total_guesses": sum(solve["total_guesses"] for solve in solves) / len(solves),
+                    "strategies": strategies,
+                }
+        return report
+
+    def _check(self, request: dict) -> str:
+        """
+        Checks the job arguments before anything starts, returns the error message or None
+        """
+        calibrations, budgets = request.get("calibrations", []), request.get("budgets", [])
+        if not isinstance(calibrations, list) or not isinstance(budgets, list):
+            return "The calibrations and budgets must be lists"
+        for calibration in calibrations + [request.get("calibration", "curve")]:
+            if (calibration or "none") not in CALIBRATIONS:
+                return f"Unknown calibration \"{calibration}\""
+        for budget in budgets + [request.get("budget", "adaptive")]:
+            if budget not in BUDGETS:
+                return f"Unknown budget \"{budget}\""
+        return None
+
+    def _status(self):
+        return {"uptime": time.time() - self.started, "jobs_done": self.jobs_done,
+                "busy": self._job_lock.locked(), "warm_drivers": self.pool.ready()}
+
+    def handle(self, request: dict, send):
+        """
+        Runs a job and streams its progress with send, returns the final message
+        """
+        command = request.get("command")
+        if command == "status":
+            return {"event": "done", **self._status()}
+        if command == "cancel":
+            self._cancel()
+            return {"event": "done"}
+        if command == "shutdown":
+            self._cancel()
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {"event": "done"}
+        if command not in ("solve", "benchmark"):
+            return {"event": "error", "message": f"Unknown command \"{command}\""}
+        error = self._check(request)
+        if error is not None:
+            return {"event": "error", "message": error}
+        if not self._job_lock.acquire(blocking=False):
+            return {"event": "error", "message": "A job is already running"}
+        try:
+            if command == "solve":
+                result = self._solve(send, request.get("threads", 3), request.get("calibration", "curve"),
+                                     request.get("budget", "adaptive") == "adaptive")
+            else:
+                result = self._benchmark(send, request.get("runs", 3), request.get("threads", 3),
+                                         request.get("calibrations", ["curve"]), request.get("budgets", ["adaptive"]))
+            self.jobs_done += 1
+            return {"event": "done", "result": result}
+        except Exception as e:
+            return {"event": "error", "message": str(e)}
+        finally:
+            self._job_lock.release()
+
+    def serve(self):
+        """
+        Warms everything up then serves jobs until a shutdown command
+        """
+        self._warm_up()
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                lock = threading.Lock()
+                def send(data):
+                    with lock:
+                        self.wfile.write((json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                try:
+                    request = json.loads(self.rfile.readline().decode("utf-8"))
+                except ValueError:
+                    send({"event": "error", "message": "Invalid request"})
+                    return
+                try: send(daemon.handle(request, send))
+                except OSError: pass    # the client left before the end of the job
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        with socketserver.ThreadingTCPServer((self.host, self.port), Handler) as server:
+            self.server = server
+            self.started = time.time()
+            print(f"Cemantix daemon listening on {self.host}:{self.port}")
+            server.serve_forever()
+        self.pool.close()
+
+
+def request(data: dict, host: str = HOST, port: int = PORT):
+    """
+    Sends a job to the daemon and yields the streamed messages until the final one
+    """
+    with socket.create_connection((host, port)) as connection:
+        connection.sendall((json.dumps(data) + "\n").encode("utf-8"))
+        with connection.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                message = json.loads(line)
+                yield message
+                if message.get("event") in ("done", "error"):
+                    return
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident cemantix solver, keeps the model and the browsers warm between runs.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="start the daemon")
+    serve_parser.add_argument("--pool-size", type=int, default=4)
+    serve_parser.add_argument("--verbose", type=int, default=1)
+    serve_parser.add_argument("--job-timeout", type=float, default=3600, help="maximum duration of a solve in seconds")
+    solve_parser = commands.add_parser("solve", help="solve the word of the day")
+    solve_parser.add_argument("--threads", type=int, default=3)
+    solve_parser.add_argument("--calibration", default="curve", choices=CALIBRATIONS)
+    solve_parser.add_argument("--budget", default="adaptive", choices=BUDGETS)
+    benchmark_parser = commands.add_parser("benchmark", help="solve several times and report the means")
+    benchmark_parser.add_argument("--runs", type=int, default=3)
+    benchmark_parser.add_argument("--threads", type=int, default=3)
+    benchmark_parser.add_argument("--calibrations", nargs="+", default=["curve"], choices=CALIBRATIONS)
+    benchmark_parser.add_argument("--budgets", nargs="+", default=["adaptive"], choices=BUDGETS)
+    commands.add_parser("status", help="show the daemon status")
+    commands.add_parser("cancel", help="cancel the running job")
+    commands.add_parser("shutdown", help="stop the daemon")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        CemantixDaemon(args.host, args.port, args.pool_size, args.verbose, args.job_timeout).serve()
+    else:
+        job = {"command": args.command}
+        if args.command == "solve":
+            job.update(threads=args.threads, calibration=args.calibration, budget=args.budget)
+        elif args.command == "benchmark":
+            job.update(runs=args.runs, threads=args.threads, calibrations=args.calibrations, budgets=args.budgets)
+        for message in request(job, args.host, args.port):
+            print(json.dumps(message, ensure_ascii=False))
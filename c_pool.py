@@ -0,0 +1,86 @@
+import datetime
+import queue
+import threading
+from selenium import webdriver
+
+
+class CemantixDriverPool:
+    """
+    Class for a pool of warm cemantix browser sessions.
+
+    Description:
+    The CemantixDriverPool class keeps Firefox drivers started with cemantix already loaded, so a solver
+    can start guessing without waiting for the browser. A driver is used by a single solve, the solver
+    quits it when done and the pool starts a new one in the background to replace it. The page of a
+    driver warmed on a previous day is reloaded before being handed out, since the word changed since.
+
+    Arguments:
+    size (int): Number of warm drivers to keep ready.
+    url (str): Page loaded in the warm drivers.
+    """
+
+    def __init__(self, size: int = 4, url: str = "https://cemantix.certitudes.org/"):
+        if size < 1: size = 1
+        self.size = size
+        self.url = url
+        self._drivers = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _start_driver(self):
+        """
+        Starts a driver and puts it in the pool once the page is loaded
+        """
+        try:
+            driver = self._new_driver()
+        except Exception as e:
+            print(f"Error while warming a driver: {e}")
+            return
+        with self._lock:
+            if self._closed:
+                driver.quit()
+                return
+            self._drivers.put((driver, datetime.date.today()))
+
+    def _new_driver(self):
+        driver = webdriver.Firefox()
+        driver.maximize_window()
+        driver.get(self.url)
+        return driver
+
+    def _refill(self, count: int = 1):
+        for _ in range(count):
+            threading.Thread(target=self._start_driver, daemon=True).start()
+
+    def start(self):
+        """
+        Warms up the whole pool in the background
+        """
+        self._refill(self.size)
+
+    def ready(self) -> int:
+        return self._drivers.qsize()
+
+    def get(self, timeout: float = 60):
+        """
+        Takes a warm driver with the page loaded, a replacement is started right away.
+        If none gets ready in time (warming keeps failing) a driver is started directly.
+        """
+        self._refill()
+        try:
+            driver, warmed = self._drivers.get(timeout=timeout)
+        except queue.Empty:
+            return self._new_driver()
+        if warmed != datetime.date.today():     # stale page, yesterday's word
+            driver.get(self.url)
+        return driver
+
+    def close(self):
+        """
+        Quits all the waiting drivers
+        """
+        with self._lock:
+            self._closed = True
+        while not self._drivers.empty():
+            try: self._drivers.get_nowait()[0].quit()
+            except Exception: pass
@@ -7,6 +7,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
+from c_scheduler import CemantixScheduler, RANDOM
+from c_submit import submit_word, best_score
+from c_pool import CemantixDriverPool
+
+# word lists read from disk, loaded once per process and shuffled per solver
+_word_lists = {}
        
 class CemantixRandomSolver:
     """
@@ -19,12 +25,16 @@ class CemantixRandomSolver:
     Arguments:
     instance (int): Instance number, determines where the class saves useful words.
     lang_usable_words (str): Path to the file containing the words to insert in cemantix.
+    scheduler (CemantixScheduler): Shared scheduler pacing the submissions, None to use a fixed sleep.
+    driver_pool (CemantixDriverPool): Pool of warm drivers to take the driver from, None to start a new one.
     """
 
-    def __init__(self, instance:int, lang_usable_words:str = "liste_francais_maculins_utf8.txt"):
+    def __init__(self, instance:int, lang_usable_words:str = "liste_francais_maculins_utf8.txt", scheduler: CemantixScheduler = None, driver_pool: CemantixDriverPool = None):
         if instance < 1: instance = 1
         self.instance = instance
         self.lang_usable_words = lang_usable_words
+        self.scheduler = scheduler
+        self.driver_pool = driver_pool
         self.close_words_txt = f"close_words/close_words_{self.instance}.txt"
         self.far_words_txt = f"far_words/far_words_{self.instance}.txt"
         self.driver = None
@@ -47,10 +57,14 @@ class CemantixRandomSolver:
     # Driver funtions
     def _initialize_driver(self):
         """
-        Sets up a Firefox driver
+        Sets up a Firefox driver, or takes a warm one from the pool with cemantix already loaded
         """
+        if self.driver_pool is not None:
+            self.driver = self.driver_pool.get()
+            return
         self.driver = webdriver.Firefox()
         self.driver.maximize_window()
+        self._open_cemantix()
 
     def _open_cemantix(self):
         """
@@ -66,6 +80,11 @@ class CemantixRandomSolver:
         wait = WebDriverWait(self.driver, 10)
         return wait.until(EC.presence_of_element_located((By.ID, "cemantix-guess")))
 
+    def _input_word(self, input_field, word: str):
+        input_field.clear()
+        input_field.send_keys(word)
+        input_field.send_keys(Keys.RETURN)
+
     def _check_for_success(self):
         """
         Check if success
@@ -161,8 +180,10 @@ class CemantixRandomSolver:
         """
         Loads close and far words from txt files
         """
-        with open(self.lang_usable_words, 'r', encoding='utf-8') as file:
-            words = file.read().splitlines()
+        if self.lang_usable_words not in _word_lists:
+            with open(self.lang_usable_words, 'r', encoding='utf-8') as file:
+                _word_lists[self.lang_usable_words] = file.read().splitlines()
+        words = list(_word_lists[self.lang_usable_words])
         random.shuffle(words)
         return words
 
@@ -194,13 +215,15 @@ class CemantixRandomSolver:
 
         self._write_to_file(self.close_words_txt, close_words_write)
         self._write_to_file(self.far_words_txt, far_words_write)
+        best = best_score(close_words)
+        if self.scheduler is not None and best is not None:
+            self.scheduler.update_best_score(best[1])
 
 
     def run(self, stop_event: Event, quit_event: Event):
         """
         """
         self._initialize_driver()
-        self._open_cemantix()
         input_field = self._get_input_field()
         
         try_count = 0
@@ -210,10 +233,11 @@ class CemantixRandomSolver:
             if not word:
                 break
 
-            time.sleep(0.05)
-            input_field.clear()
-            input_field.send_keys(word)
-            input_field.send_keys(Keys.RETURN)
+            if self.scheduler is None:
+                time.sleep(0.05)
+                self._input_word(input_field, word)
+            elif not self.scheduler.submit(RANDOM, submit_word, self.driver, input_field, word, stop_event=stop_event):
+                break
 
             try_count += 1
 
@@ -0,0 +1,173 @@
+import threading
+import time
+
+# priority classes, lower value is served first
+SMART = 0
+RANDOM = 1
+
+
+class CemantixScheduler:
+    """
+    Class for a shared cemantix submission scheduler.
+
+    Description:
+    The CemantixScheduler class paces the submissions of every solver thread through a single
+    token bucket. A submission covers the whole game round trip, from typing the word to the game
+    answering it. The bucket rate grows while the game answers quickly and the bucket is what holds the
+    solvers back, and shrinks on slow or missing answers. Smart guesses are always served before random
+    ones, and once the best score found passes a threshold random probing is scaled down to a share of
+    the random throughput measured before the threshold.
+
+    Arguments:
+    rate (float): Starting number of submissions per second, shared by all the solvers.
+    min_rate (float): The rate never goes under this value.
+    max_rate (float): The rate never goes over this value, None to let the game answers set the limit.
+    burst (float): Maximum number of tokens the bucket can hold.
+    target_latency (float): Round trips slower than this (in seconds) are treated as a throttling sign.
+    random_threshold (float): Best score over which random probing gets scaled down.
+    random_share (float): Share of the measured random throughput kept once the threshold is passed.
+    """
+
+    def __init__(self, rate: float = 30.0, min_rate: float = 1.0, max_rate: float = None, burst: float = 5.0,
+                 target_latency: float = 0.5, random_threshold: float = 40.0, random_share: float = 0.25):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.target_latency = target_latency
+        self.random_threshold = random_threshold
+        self.random_share = random_share
+        self.best_score = None
+        self.submitted = 0
+        self.errors = 0
+        self._tokens = burst
+        self._last_refill = time.monotonic()
+        self._next_random = 0.0
+        self._last_random = None
+        self._random_interval = None    # moving average of the time between random submissions
+        self._token_limited = False     # a submission had to wait for a token since the last increase
+        self._waiting = {SMART: 0, RANDOM: 0}
+        self._condition = threading.Condition()
+
+    # Token bucket
+    def _refill(self):
+        """
+        Adds the tokens earned since the last refill
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _random_scaled_down(self) -> bool:
+        return self.best_score is not None and self.best_score >= self.random_threshold
+
+    def _can_go(self, priority: int) -> bool:
+        """
+        Check if a submission of this priority can take a token now
+        """
+        if self._tokens < 1:
+            return False
+        if any(count > 0 for other, count in self._waiting.items() if other < priority):
+            return False
+        if priority == RANDOM and self._random_scaled_down():
+            return time.monotonic() >= self._next_random
+        return True
+
+    def _wait_time(self, priority: int) -> float:
+        """
+        Time to wait before the next check, capped so priority changes are seen quickly
+        """
+        wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.01
+        if priority == RANDOM and self._random_scaled_down():
+            wait = max(wait, self._next_random - time.monotonic())
+        return min(max(wait, 0.005), 0.5)
+
+    def acquire(self, priority: int = RANDOM, stop_event: threading.Event = None) -> bool:
+        """
+        Blocks until a submission of this priority is allowed, returns False if stop_event got set
+        """
+        with self._condition:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    if stop_event is not None and stop_event.is_set():
+                        return False
+                    self._refill()
+                    if self._can_go(priority):
+                        self._tokens -= 1
+                        if priority == RANDOM: self._pace_random()
+                        return True
+                    if self._tokens < 1: self._token_limited = True
+                    self._condition.wait(self._wait_time(priority))
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+    def _pace_random(self):
+        """
+        Measures the random throughput until the threshold, then spaces the random submissions
+        so they keep random_share of it. The measure stops at the threshold so it doesn't follow the slow down.
+        """
+        now = time.monotonic()
+        if not self._random_scaled_down():
+            if self._last_random is not None:
+                interval = now - self._last_random
+                self._random_interval = interval if self._random_interval is None else 0.8 * self._random_interval + 0.2 * interval
+        else:
+            interval = self._random_interval if self._random_interval is not None else 1 / self.rate
+            self._next_random = now + interval / self.random_share
+        self._last_random = now
+
+    @property
+    def random_throughput(self) -> float:
+        return 1 / self._random_interval if self._random_interval else 0.0
+
+    # Adaptation
+    def report(self, latency: float, error: bool = False):
+        """
+        Adapts the rate to the round trip of the last submission, additive increase and multiplicative decrease.
+        An error is a submission the game did not answer. The rate only grows when the bucket made someone wait,
+        otherwise the solvers are held back by the round trips and a higher rate would mean nothing.
+        """
+        with self._condition:
+            self.submitted += 1
+            if error:
+                self.errors += 1
+                self.rate = max(self.min_rate, self.rate * 0.5)
+                self._tokens = min(self._tokens, 0)  # drain so everyone backs off
+            elif latency > self.target_latency:
+                self.rate = max(self.min_rate, self.rate * 0.8)
+            elif self._token_limited:
+                self._token_limited = False
+                self.rate = self.rate + 0.5 / self.rate
+                if self.max_rate is not None: self.rate = min(self.max_rate, self.rate)
+            self._condition.notify_all()
+
+    def update_best_score(self, score: float):
+        """
+        Keeps track of the best score found by any solver
+        """
+        with self._condition:
+            if self.best_score is None or score > self.best_score:
+                self.best_score = score
+            self._condition.notify_all()
+
+    def submit(self, priority: int, function, *args, stop_event: threading.Event = None, **kwargs):
+        """
+        Waits for a token then runs the submission function, which returns True once the game answered.
+        Its round trip and missing answers are fed back to the bucket.
+        Returns False without running anything if stop_event got set while waiting.
+        """
+        if not self.acquire(priority, stop_event):
+            return False
+        start = time.monotonic()
+        try:
+            answered = function(*args, **kwargs)
+        except Exception:
+            self.report(time.monotonic() - start, error=True)
+            raise
+        self.report(time.monotonic() - start, error=not answered)
+        return True
+
+    def status(self) -> str:
+        return f"rate={'{0:.2f}'.format(self.rate)}/s, random={'{0:.2f}'.format(self.random_throughput)}/s, submitted={self.submitted}, errors={self.errors}, best={self.best_score}"
@@ -13,6 +13,11 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
+from c_scheduler import CemantixScheduler, SMART
+from c_submit import submit_word, best_score
+from c_calibration import ScoreCalibrator
+from c_pool import CemantixDriverPool
+from c_bandit import StrategyAllocator
 
 # loads french model
 models = ['cc.fr.300.vec', 'wiki.fr.vec']
@@ -20,6 +25,15 @@ print(f"Loading word model...", end='')
 french_model = KeyedVectors.load_word2vec_format(models[0], binary=False, encoding='utf-8', unicode_errors='ignore')
 print(f"done!")
 
+# sorted word lists used by the Levenshtein functions, loaded once per process
+_sorted_words = {}
+
+def _load_sorted_words(path: str = 'liste_francais_maculins_utf8.txt') -> List[str]:
+    if path not in _sorted_words:
+        with open(path, 'r', encoding='utf-8') as f:
+            _sorted_words[path] = [line.strip() for line in f.readlines()]
+    return _sorted_words[path]
+
 
 class CemantixSmartSolver:
     """
@@ -33,16 +47,38 @@ class CemantixSmartSolver:
     smart_words_file (str): Path to the file to save used words.
     close_words_file (str): Path to the file to save useful words.
     verbose (int): Verbose argument, 0=nothing, 1=success message, 2=every word.
+    scheduler (CemantixScheduler): Shared scheduler pacing the submissions, None to use a fixed sleep.
+    calibration (str): Calibration between the game scores and the model, "curve", "linear" or None to disable it.
+    driver_pool (CemantixDriverPool): Pool of warm drivers to take the driver from, None to start a new one.
+    progress (callable): Called with a dict for every guess, round and success, None to disable it.
+    adaptive_budget (bool): Shift the candidate budget toward the strategies that improve the score, False for fixed budgets.
+    strategy_stats_file (str): Path to the file to save the per strategy yield statistics.
     """
 
-    def __init__(self, smart_words_file="smart_words/smart_words.txt", close_words_file="close_words/close_words_0.txt", verbose: int=1):
+    # thresholds on the game scale, moved to the model cosine scale once the calibration covers them
+    near_hit_score = 51.90
+    top_band_score = 10
+
+    def __init__(self, smart_words_file="smart_words/smart_words.txt", close_words_file="close_words/close_words_0.txt", verbose: int=1, scheduler: CemantixScheduler = None, calibration: str = "curve", driver_pool: CemantixDriverPool = None, progress = None, adaptive_budget: bool = True, strategy_stats_file: str = "strategy_stats.json"):
         self.smart_words_file = smart_words_file
         self.close_words_file = close_words_file
         self.driver = None
         self.start_time = None
         self.try_count = 0
+        self.guess_count = 0
         self.found_success = False
         self.verbose = verbose
+        self.scheduler = scheduler
+        self.calibrator = ScoreCalibrator(french_model, mode=calibration) if calibration else None
+        self.driver_pool = driver_pool
+        self.progress = progress
+        self.adaptive_budget = adaptive_budget
+        self.strategy_stats_file = strategy_stats_file
+        self.allocator = StrategyAllocator()
+        self.candidate_strategies = {}  # word -> strategy that produced it, for the current round
+        self.best_score = None
+        self._known_scores = {}     # words already scored before the round, by any solver
+        self._allocation = {}
         self._init_files()
 
     def _init_files(self):
@@ -62,10 +98,14 @@ class CemantixSmartSolver:
     # Driver funtions
     def _initialize_driver(self):
         """
-        Sets up a Firefox driver
+        Sets up a Firefox driver, or takes a warm one from the pool with cemantix already loaded
         """
+        if self.driver_pool is not None:
+            self.driver = self.driver_pool.get()
+            return
         self.driver = webdriver.Firefox()
         self.driver.maximize_window()
+        self._open_cemantix()
 
     def _open_cemantix(self):
         """
@@ -156,8 +196,14 @@ class CemantixSmartSolver:
         word = self._extract_winning_word()
         self.driver.quit()
         self._close_files()
-        if self.verbose > 0 : print(f"Word is \"{word}\", succeded in {'{0:.2f}'.format(time_end)}s at {current_datetime} !")
-        return word, time_end
+        if self.calibrator is not None: self._log(self.calibrator.status(), "Calibration")
+        strategy_stats = self.allocator.stats()
+        self.allocator.export(self.strategy_stats_file)
+        self._log(strategy_stats, "Strategies")
+        total_guesses = self.scheduler.submitted if self.scheduler is not None else self.guess_count    # random solvers included
+        self._progress(event="success", word=word, time=time_end, guesses=self.guess_count, total_guesses=total_guesses)
+        if self.verbose > 0 : print(f"Word is \"{word}\", succeded in {'{0:.2f}'.format(time_end)}s and {self.guess_count} guesses ({total_guesses} in total) at {current_datetime} !")
+        return word, time_end, self.guess_count, total_guesses, strategy_stats
 
     # txt functions
     def _save_used_words(self, used_words:List[str]):
@@ -192,6 +238,7 @@ class CemantixSmartSolver:
                         if ':' in line:
                             word, value = line.split(':')
                             far_words_dic[word] = value
+                            self._observe(word, value)
             sorted_far_words = sorted(far_words_dic.items(), key=lambda x: x[1])
             bottom_100_words = sorted_far_words[:100]
             bottom_100_words = bottom_100_words[::-1]
@@ -212,30 +259,40 @@ class CemantixSmartSolver:
                             try:
                                 score = float(score)
                                 sorted_close_words.append((word, score))
+                                self._observe(word, score)
                             except ValueError:
                                 pass
                             
         sorted_close_words.sort(key=lambda x: x[1], reverse=True)
+        if self.calibrator is not None: self.calibrator.fit()
+        self._known_scores = {word: score for word, score in sorted_close_words}
         output_words = []
+        near_hit_cosine = self._calibrated_threshold(self.near_hit_score)
         for word, score in sorted_close_words:
             if score == 100.00:
                 self._input_word(self._get_input_field(), word)
                 close_words = [word]
                 return [], close_words, [], []
-            elif score >= 51.90:    # this is pretty close
+            elif self._is_near_hit(word, score, near_hit_cosine):    # this is pretty close
                 close_words.append(word)
-                output_words.append(word)
-                output_words.extend(self._get_close_word(word, top_n=min(self.try_count,20)))  # this is a leverstein distance closeness not semantic so don't add it to close_words
+                output_words.append(word)    # already scored, not credited to any strategy
+                output_words.extend(self._tag(self._get_close_word(word, top_n=self._budget(min(self.try_count,20), "levenshtein")), "levenshtein"))  # this is a leverstein distance closeness not semantic so don't add it to close_words
             else:
                 close_words.append(word)
         if len(sorted_close_words)>0:
-            top_value = sorted_close_words[0][1]
+            top_word, top_value = sorted_close_words[0]
             top_close_words.append(sorted_close_words[0])
+            top_predicted, top_band = self._calibrated_top_band(top_word, top_value)
             for word, score in sorted_close_words[1:]:
-                if abs(score - top_value) <= 10:
-                    top_close_words.append(word)
-                else:
-                    break
+                if top_band is None:
+                    if abs(score - top_value) <= self.top_band_score:
+                        top_close_words.append(word)
+                    else:
+                        break
+                else:   # on the model scale a word further down the scores can still be in the band
+                    predicted = self.calibrator.predict(word)
+                    if predicted is not None and abs(predicted - top_predicted) <= top_band:
+                        top_close_words.append(word)
         return far_words, close_words, top_close_words, output_words
 
     # Guess functions
@@ -244,6 +301,10 @@ class CemantixSmartSolver:
         Generate semantic guesses based on the scores of words from close and far word lists.
         """
 
+        # Share the budget of the round between the strategies
+        self.candidate_strategies = {}
+        self._allocation = self.allocator.allocate() if self.adaptive_budget else {}
+
         # Load and process words from txt files
         far_words, close_words, top_close_words, output_words = self._load_words(close_folder_path, far_folder_path)
         
@@ -255,9 +316,100 @@ class CemantixSmartSolver:
         
         # Filter the output words based on previously saved  in the smart words files
         filtered_output = self._filter_smart_words(output_words)
-        
+
+        # Most promising words first according to the calibrated model
+        if self.calibrator is not None:
+            filtered_output = self.calibrator.rank(filtered_output)
+
         return filtered_output
 
+    # Strategy functions
+    def _budget(self, base: int, strategy: str) -> int:
+        """
+        Number of candidates a strategy can ask for this round
+        """
+        return max(1, round(base * self._allocation.get(strategy, 1)))
+
+    def _tag(self, words: List[str], strategy: str) -> List[str]:
+        """
+        Remember which strategy produced the words, the first one to produce a word keeps it
+        """
+        for word in words:
+            self.candidate_strategies.setdefault(word, strategy)
+        self.allocator.propose(strategy, len(words))
+        return words
+
+    def _credit_strategies(self, round_words: List[str], close_words: List[tuple]):
+        """
+        Credit the score of every word guessed this round to the strategy that produced it,
+        words already scored before the round are not credited
+        """
+        scores = {}
+        for word, score in close_words:
+            try: scores[word] = float(score)
+            except ValueError: pass
+        known_scores = list(self._known_scores.values())
+        if self.best_score is not None: known_scores.append(self.best_score)
+        best_before = max(known_scores, default=None)
+        for word in round_words:
+            strategy = self.candidate_strategies.get(word)
+            if strategy is None or word in self._known_scores:
+                continue
+            score = scores.get(word)    # not in the 100 best words of the page, worth nothing
+            improvement = score is not None and (best_before is None or score > best_before)
+            reward = 1.0 if improvement else (0.0 if score is None else max(score, 0) / 200)
+            self.allocator.credit(strategy, reward, improvement)
+        if len(scores) > 0:
+            self.best_score = max(scores.values()) if best_before is None else max(best_before, max(scores.values()))
+        self.allocator.end_round()
+
+    # Calibration functions
+    def _observe(self, word: str, score):
+        """
+        Feed a word and its game score to the calibration
+        """
+        if self.calibrator is None:
+            return
+        try:
+            self.calibrator.observe(word, float(score))
+        except ValueError:
+            pass
+
+    def _calibrated_threshold(self, score: float) -> float:
+        """
+        Model cosine matching a game score, None while the calibration doesn't cover that score
+        """
+        if self.calibrator is None or not self.calibrator.covers(score):
+            return None
+        return self.calibrator.to_cosine(score)
+
+    def _is_near_hit(self, word: str, score: float, near_hit_cosine: float) -> bool:
+        """
+        Near-hit on the model scale when calibrated, on the raw game score otherwise
+        """
+        predicted = self.calibrator.predict(word) if near_hit_cosine is not None else None
+        if predicted is None:
+            return score >= self.near_hit_score
+        return predicted >= near_hit_cosine
+
+    def _calibrated_top_band(self, top_word: str, top_value: float) -> tuple:
+        """
+        Model cosine of the top word and width of the top band on the model scale, (None, None) to use the game scores
+        """
+        low = self._calibrated_threshold(top_value - self.top_band_score)
+        high = self._calibrated_threshold(top_value)
+        if low is None or high is None or high <= low:
+            return None, None
+        top_predicted = self.calibrator.predict(top_word)
+        if top_predicted is None:
+            return None, None
+        return top_predicted, high - low
+
+    def _progress(self, **data):
+        if self.progress is not None:
+            try: self.progress(data)
+            except Exception: pass    # a broken listener must not stop the solve
+
     def _log(self, data, model=""):
         with open("log.txt", mode='a', encoding='utf-8') as file:
             file.write(f"{self.try_count},{model}: {data}\n")
@@ -277,41 +429,45 @@ class CemantixSmartSolver:
         max_word_count = min(self.try_count,50)
 
         # Basic similar words
+        basic_count = self._budget(max_word_count, "basic")
         _similar_words =[]
         _similar_words.extend(
-            self._get_similar_words_array_input(top_close_words, far_words, top_n=max_word_count))
+            self._get_similar_words_array_input(top_close_words, far_words, top_n=basic_count))
         _similar_words.extend(
-            self._get_similar_words_array_input(top_close_words, top_n=max_word_count))
+            self._get_similar_words_array_input(top_close_words, top_n=basic_count))
         self._log(_similar_words, "Basic")
 
         # Randomness
+        random_count = self._budget(max_word_count, "random")
         _random_words = []
         _random_words.extend(
             self._get_similar_words_array_input(
-                self._random_array_crop(close_words), top_n=max_word_count))
+                self._random_array_crop(close_words), top_n=random_count))
         _random_words.extend(
             self._get_similar_words_array_input(
-                self._random_array_crop(close_words), self._random_array_crop(far_words), top_n=max_word_count))
+                self._random_array_crop(close_words), self._random_array_crop(far_words), top_n=random_count))
         _random_words.extend(
             self._get_similar_words_array_input(
-                self._random_array_crop(top_close_words), top_n=max_word_count))
+                self._random_array_crop(top_close_words), top_n=random_count))
         self._log(_random_words, "Random")
 
         # Best matches
+        best_count = self._budget(max_word_count, "best")
         _best_words = []
         _best_words.extend(
-            self._get_similar_words_singular_input(close_words[0], far_words, top_n=max_word_count))
+            self._get_similar_words_singular_input(close_words[0], far_words, top_n=best_count))
         _best_words.extend(
-            self._get_similar_words_singular_input(close_words[0], top_n=max_word_count))
+            self._get_similar_words_singular_input(close_words[0], top_n=best_count))
         _best_words.extend(
-            self._get_similar_words_array_input(close_words[:5], far_words, top_n=max_word_count))
+            self._get_similar_words_array_input(close_words[:5], far_words, top_n=best_count))
         _best_words.extend(
-            self._get_similar_words_array_input(close_words[:5], top_n=max_word_count))
+            self._get_similar_words_array_input(close_words[:5], top_n=best_count))
         self._log(_best_words, "Best")
+        self._log(self._allocation, "Budget")
 
-        output_words.extend(_similar_words)
-        output_words.extend(_random_words)
-        output_words.extend(_best_words)
+        output_words.extend(self._tag(_similar_words, "basic"))
+        output_words.extend(self._tag(_random_words, "random"))
+        output_words.extend(self._tag(_best_words, "best"))
         return output_words
 
     def _filter_smart_words(self, output_words: List[str]) -> List[str]:
@@ -385,43 +541,39 @@ class CemantixSmartSolver:
 
     def _get_close_words(self, over_51_words: List[str], sorted_words: List[str] = None, max_distance: int = 2, top_n: int = 100) -> List[str]:
         """
-        Get close words based on Levenshtein distance, for an array input
+        Get close words based on Levenshtein distance, for an array input, top_n per word
         """
-        if len(over_51_words) == 1:
-            return self._get_close_word(over_51_words, sorted_words, max_distance, top_n)
-        elif len(over_51_words) < 1:
-            return []
         if not sorted_words:
-            with open('liste_francais_maculins_utf8.txt', 'r', encoding='utf-8') as f:
-                sorted_words = [line.strip() for line in f.readlines()]
+            sorted_words = _load_sorted_words()
         close_words = []
         for word in over_51_words:
-            try:
-                mid_index = sorted_words.index(word)
-            except ValueError: continue  # skip
-            low_index = max(mid_index - 10, 0)
-            for i in range(20):
-                if self._levenshtein_distance(word, sorted_words[low_index + i]) <= max_distance:
-                    close_words.append(sorted_words[low_index + i])
+            close_words.extend(self._get_close_word(word, sorted_words, max_distance, top_n))
 
         return close_words
 
-    def _get_close_word(self, over_51_word: List[str], sorted_words: List[str] = None, max_distance: int = 2, top_n: int = 100) -> List[str]:
+    def _get_close_word(self, over_51_word: str, sorted_words: List[str] = None, max_distance: int = 2, top_n: int = 100) -> List[str]:
         """
-        Get close words based on Levenshtein distance, for an singular input
+        Get close words based on Levenshtein distance, for an singular input.
+        The window is centred on the word and the top_n closest matches are returned, nearest neighbours first
         """
-        if len(over_51_word) > 1:
+        if isinstance(over_51_word, list):
             return self._get_close_words(over_51_word, sorted_words, max_distance, top_n)
+        if top_n < 1:
+            return []
         if not sorted_words:
-            with open('liste_francais_maculins_utf8.txt', 'r', encoding='utf-8') as f:
-                sorted_words = [line.strip() for line in f.readlines()]
-        close_words = []
+            sorted_words = _load_sorted_words()
         try:mid_index = sorted_words.index(over_51_word)
         except ValueError: return []    # this error is unliekely 
-        low_index = max(mid_index - 10, 0)
-        for i in range(top_n):
-            if self._levenshtein_distance(over_51_word, sorted_words[low_index+i]) <= max_distance:
-                close_words.append(sorted_words[low_index+i])
+        half_width = max(10, top_n)     # the scan is cheap, the budget is spent on the returned words
+        matches = []
+        for i in range(max(mid_index - half_width, 0), min(mid_index + half_width + 1, len(sorted_words))):
+            if sorted_words[i] == over_51_word:
+                continue
+            distance = self._levenshtein_distance(over_51_word, sorted_words[i])
+            if distance <= max_distance:
+                matches.append((distance, abs(i - mid_index), sorted_words[i]))
+        matches.sort()
+        close_words = [word for _, _, word in matches[:top_n]]
 
         return close_words
 
@@ -437,7 +589,6 @@ class CemantixSmartSolver:
         """
         self.start_time = time.time()
         self._initialize_driver()
-        self._open_cemantix()
         self._close_dialog()
         input_field = self._get_input_field()
         used_words = []
@@ -446,7 +597,7 @@ class CemantixSmartSolver:
         while True:
             words = []
             self.try_count+=1
-            while len(words) < 1:
+            while len(words) < 1 and not quit_event.is_set():
                 words = self._generate_semantic_guesses()
                 pattern = re.compile(r"^[a-zA-ZÀ-ÿéèçàêôîïüöàÀ-ÿ\s\-]+$")
                 words = [word for word in words if pattern.match(word)]
@@ -454,26 +605,42 @@ class CemantixSmartSolver:
 
             while len(words) >= 1:
                 word = words.pop(0)
-                self._input_word(input_field=input_field, word=word)
+                if self.scheduler is None:
+                    self._input_word(input_field=input_field, word=word)
+                    time.sleep(0.1)
+                else:
+                    self.scheduler.submit(SMART, submit_word, self.driver, input_field, word)
                 if self.verbose > 1 :print(f"{word}                           ", end="\r")
                 used_words.append(word)
-                time.sleep(0.1)
+                self.guess_count += 1
+                self._progress(event="guess", word=word, guesses=self.guess_count)
                 if self._check_for_success():
                     self.found_success = True
                     break
-                if stop_event.is_set():
+                if stop_event.is_set() or quit_event.is_set():
                     break
 
+            if quit_event.is_set() and not self.found_success:    # cancelled from outside, the solve is dropped
+                self.driver.quit()
+                self._close_files()
+                return ()
+
             if self.found_success:
                 time.sleep(5)
                 stop_event.set()
                 break
                     
             self._save_used_words(used_words)
+            round_words = used_words
             used_words = []
 
             close_words = self._extract_close_words()
             self._save_close_words(close_words)
+            self._credit_strategies(round_words, close_words)
+            best = best_score(close_words)
+            if best is not None:
+                if self.scheduler is not None: self.scheduler.update_best_score(best[1])
+                self._progress(event="round", round=self.try_count, guesses=self.guess_count, best=best[0], score=best[1])
 
         self._input_word(input_field=input_field, word="lave")
         results = self._finish_setup(quit_event=quit_event)
@@ -0,0 +1,47 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+# submission helpers shared by the solvers, the scheduler runs submit_word for them
+
+
+def wait_for_answer(driver, word: str, timeout: float = 5) -> bool:
+    """
+    Wait for the game to answer a guess, True if the word got in the guesses or was refused as unknown
+    """
+    literal = f'"{word}"' if "'" in word else f"'{word}'"
+    row_xpath = f"//table[@id='cemantix-guessable']//td[contains(@class, 'word') and normalize-space(text())={literal}]"
+    def answered(driver):
+        if driver.find_elements(By.XPATH, row_xpath):
+            return True
+        errors = driver.find_elements(By.ID, "cemantix-error")
+        return len(errors) > 0 and errors[0].is_displayed() and word in errors[0].text
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.05, ignored_exceptions=[StaleElementReferenceException]).until(answered)
+        return True
+    except TimeoutException:
+        return False
+
+
+def submit_word(driver, input_field, word: str) -> bool:
+    """
+    Input a word and wait for the game round trip
+    """
+    input_field.clear()
+    input_field.send_keys(word)
+    input_field.send_keys(Keys.RETURN)
+    return wait_for_answer(driver, word)
+
+
+def best_score(close_words) -> tuple:
+    """
+    Best (word, score) of the extracted rows, the first row is not always the best one
+    """
+    best = None
+    for word, score in close_words:
+        try: score = float(score)
+        except ValueError: continue
+        if best is None or score > best[1]:
+            best = (word, score)
+    return best
@@ -1,24 +1,47 @@
 import threading
+import time
 from c_random import CemantixRandomSolver
 from c_smart import CemantixSmartSolver # loading the FastText French model takes a while (~200s), consider runing this with an anaconda gpu venv
+from c_scheduler import CemantixScheduler
 
-def main(thread_count = 3, verbose = 2):
+def _run_guarded(solver, stop_event, quit_event, *args, cancel_all = False):
+    # a failing solver quits its driver since it won't reach its own cleanup, the smart one also stops all the others
+    try:
+        solver.run(stop_event, quit_event, *args)
+    except Exception as e:
+        print(f"Error in solver: {e}")
+        if cancel_all:
+            stop_event.set()
+            quit_event.set()
+        if solver.driver is not None:
+            try: solver.driver.quit()
+            except Exception: pass
+
+def main(thread_count = 3, verbose = 2, scheduler = None, calibration = "curve", driver_pool = None, progress = None, adaptive_budget = True, stop_event = None, quit_event = None, timeout = None):
     if thread_count < 1: thread_count = 1
+    if scheduler is None: scheduler = CemantixScheduler(rate=20 * thread_count + 10)  # every submission goes through the same scheduler, starting at the old 0.05s and 0.1s sleeps
     results = []
-    stop_event = threading.Event()
-    quit_event = threading.Event()
+    if stop_event is None: stop_event = threading.Event()
+    if quit_event is None: quit_event = threading.Event()  # setting it from outside cancels the solve
+    script = CemantixSmartSolver(verbose=verbose, scheduler=scheduler, calibration=calibration, driver_pool=driver_pool, progress=progress, adaptive_budget=adaptive_budget)  # built first so a bad argument doesn't leave random solvers running
     threads = []
     for i in range(thread_count):
-        solver = CemantixRandomSolver(instance=i+1, lang_usable_words="cemantix_words_rough.txt")
-        thread = threading.Thread(target=solver.run, args=(stop_event, quit_event,))
+        solver = CemantixRandomSolver(instance=i+1, lang_usable_words="cemantix_words_rough.txt", scheduler=scheduler, driver_pool=driver_pool)
+        thread = threading.Thread(target=_run_guarded, args=(solver, stop_event, quit_event,))
         threads.append(thread)
         thread.start()
-    script = CemantixSmartSolver(verbose=verbose)
-    smart_thread = threading.Thread(target=script.run, args=(stop_event, quit_event, results,))
+    smart_thread = threading.Thread(target=_run_guarded, args=(script, stop_event, quit_event, results,), kwargs={"cancel_all": True})
     threads.append(smart_thread)
     smart_thread.start()
+    deadline = None if timeout is None else time.time() + timeout
+    for thread in threads:
+        thread.join(None if deadline is None else max(deadline - time.time(), 0))
+        if thread.is_alive():   # too long, cancel everything
+            stop_event.set()
+            quit_event.set()
+            break
     for thread in threads:
-        thread.join()
+        thread.join(30)
     return results
 
 if __name__ == "__main__":
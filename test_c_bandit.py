@@ -0,0 +1,78 @@
+import json
+import random
+import pytest
+from c_bandit import StrategyAllocator, STRATEGIES
+
+
+def credit_many(allocator, strategy, count, reward):
+    for _ in range(count):
+        allocator.credit(strategy, reward)
+
+
+def test_equal_multipliers_without_credits():
+    allocator = StrategyAllocator()
+    assert allocator.allocate() == {strategy: 1.0 for strategy in STRATEGIES}
+
+
+def test_single_tried_strategy_keeps_equal_shares():
+    allocator = StrategyAllocator()
+    credit_many(allocator, "best", 50, 0.3)
+    assert allocator.allocate() == {strategy: 1.0 for strategy in STRATEGIES}
+
+
+def test_untried_strategies_are_not_pushed_up():
+    random.seed(0)
+    allocator = StrategyAllocator()
+    for _ in range(5):
+        allocator.allocate()
+        credit_many(allocator, "basic", 20, 0.2)
+        credit_many(allocator, "best", 20, 0.25)
+        allocator.end_round()
+    multipliers = allocator.allocate()
+    assert multipliers["random"] == 1.0
+    assert multipliers["levenshtein"] == 1.0
+    assert multipliers["best"] > multipliers["basic"]
+    assert sum(multipliers.values()) == pytest.approx(len(STRATEGIES))
+
+
+def test_budget_moves_to_the_working_strategy_with_floor():
+    random.seed(1)
+    allocator = StrategyAllocator(floor=0.05)
+    for _ in range(10):
+        allocator.allocate()
+        credit_many(allocator, "basic", 10, 0.05)
+        credit_many(allocator, "random", 10, 0.05)
+        credit_many(allocator, "best", 10, 0.6)
+        credit_many(allocator, "levenshtein", 10, 0.05)
+        allocator.end_round()
+    multipliers = allocator.allocate()
+    assert multipliers["best"] > 2.5
+    for strategy in ("basic", "random", "levenshtein"):
+        assert multipliers[strategy] >= 0.05 * len(STRATEGIES) - 1e-9
+
+
+def test_discount_and_reward_clipping():
+    allocator = StrategyAllocator(discount=0.5)
+    allocator.credit("best", 2.0, improvement=True)
+    allocator.credit("best", -1.0)
+    assert allocator._successes["best"] == 1.0
+    assert allocator._failures["best"] == 1.0
+    allocator.end_round()
+    assert allocator._successes["best"] == 0.5
+    assert allocator._failures["best"] == 0.5
+    assert allocator.rounds == 1
+
+
+def test_stats_and_export(tmp_path):
+    allocator = StrategyAllocator()
+    allocator.propose("basic", 4)
+    allocator.credit("basic", 1.0, improvement=True)
+    allocator.credit("basic", 0.0)
+    stats = allocator.stats()["basic"]
+    assert stats["candidates"] == 4
+    assert stats["guesses"] == 2
+    assert stats["improvement_rate"] == 0.5
+    assert stats["mean_reward"] == 0.5
+    path = tmp_path / "strategy_stats.json"
+    allocator.export(str(path))
+    assert json.loads(path.read_text())["strategies"]["basic"]["improvements"] == 1
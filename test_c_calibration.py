@@ -0,0 +1,89 @@
+import pytest
+np = pytest.importorskip("numpy")
+from c_calibration import ScoreCalibrator
+
+
+class FakeModel:
+    def __init__(self, size: int = 300, dimension: int = 30, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.vectors = {f"w{i}": rng.normal(size=dimension) for i in range(size)}
+
+    def __contains__(self, word):
+        return word in self.vectors
+
+    def get_vector(self, word, norm=False):
+        vector = self.vectors[word]
+        return vector / np.linalg.norm(vector) if norm else vector
+
+    def cosine(self, first, second):
+        return float(self.get_vector(first, norm=True) @ self.get_vector(second, norm=True))
+
+
+def observe_game(calibrator, model, target="w0", count=150):
+    for i in range(1, count):
+        word = f"w{i}"
+        calibrator.observe(word, 100 * np.tanh(3 * model.cosine(word, target)))
+
+
+def test_identity_before_fit():
+    calibrator = ScoreCalibrator(FakeModel())
+    assert calibrator.to_cosine(51.9) == pytest.approx(0.519)
+    assert calibrator.predict("w1") is None
+    assert calibrator.rank(["w2", "w1"]) == ["w2", "w1"]
+    assert not calibrator.fit()
+
+
+def test_needs_min_observations():
+    model = FakeModel()
+    calibrator = ScoreCalibrator(model, min_observations=20)
+    observe_game(calibrator, model, count=10)
+    assert not calibrator.fit()
+    assert calibrator.to_cosine(50) == pytest.approx(0.5)
+
+
+def test_unknown_words_and_modes():
+    with pytest.raises(ValueError):
+        ScoreCalibrator(FakeModel(), mode="cubic")
+    calibrator = ScoreCalibrator(FakeModel())
+    calibrator.observe("missing", 20.0)
+    assert calibrator.observations == {}
+
+
+def test_curve_is_monotone_with_tied_scores():
+    calibrator = ScoreCalibrator(FakeModel())
+    scores = np.array([10.0, 10.0, 20.0, 30.0, 30.0, 40.0])
+    predicted = np.array([0.5, 0.1, 0.3, 0.2, 0.6, 0.4])
+    calibrator._fit_curve(scores, predicted)
+    assert np.all(np.diff(calibrator._curve_scores) > 0)
+    assert np.all(np.diff(calibrator._curve_cosines) >= 0)
+    grid = np.linspace(-100, 100, 50)
+    assert np.all(np.diff(calibrator.to_cosine(grid)) >= 0)
+
+
+@pytest.mark.parametrize("mode", ["curve", "linear"])
+def test_fit_ranks_target_neighbours_first(mode):
+    model = FakeModel()
+    calibrator = ScoreCalibrator(model, mode=mode)
+    observe_game(calibrator, model)
+    assert calibrator.fit()
+    assert calibrator.correlation > 0.8
+    candidates = [f"w{i}" for i in range(150, 300)]
+    truth = sorted(candidates, key=lambda word: -model.cosine(word, "w0"))
+    ranked = calibrator.rank(candidates + ["missing"])
+    assert ranked[-1] == "missing"
+    assert len(set(ranked[:20]) & set(truth[:20])) >= 8
+
+
+def test_threshold_outside_fitted_range_is_not_covered():
+    model = FakeModel()
+    calibrator = ScoreCalibrator(model)
+    for i in range(1, 150):     # a game where nothing got past 30
+        word = f"w{i}"
+        calibrator.observe(word, 30 * np.tanh(3 * model.cosine(word, "w0")))
+    assert calibrator.fit()
+    best = max(calibrator.observations.values())
+    assert best < 51.9
+    assert calibrator.to_cosine(51.9) == pytest.approx(calibrator.to_cosine(best))     # clamped
+    assert not calibrator.covers(51.9)
+    assert calibrator.covers(best)
+    assert not ScoreCalibrator(model).covers(10)
@@ -0,0 +1,111 @@
+import json
+import socketserver
+import threading
+import types
+import pytest
+import c_daemon
+from c_daemon import CemantixDaemon, request
+
+
+class FakePool:
+    def ready(self):
+        return 2
+
+
+def stub_main(results=None, block=None, error=None):
+    calls = []
+    def main(**kwargs):
+        calls.append(kwargs)
+        kwargs["progress"]({"event": "round", "best_score": 12.0})
+        if block is not None:
+            block.set()
+            kwargs["quit_event"].wait(5)
+            return []
+        if error is not None:
+            raise error
+        return results
+    return types.SimpleNamespace(main=main, calls=calls)
+
+
+@pytest.fixture
+def daemon():
+    daemon = CemantixDaemon()
+    daemon.started = 0
+    daemon.pool = FakePool()
+    return daemon
+
+
+def test_status_and_unknown_command(daemon):
+    status = daemon.handle({"command": "status"}, print)
+    assert status["event"] == "done"
+    assert status["warm_drivers"] == 2
+    assert not status["busy"]
+    assert daemon.handle({"command": "fly"}, print)["event"] == "error"
+
+
+def test_solve_streams_progress_and_result(daemon, monkeypatch):
+    fake = stub_main(results=("chat", 12.5, 40, 300, {"best": {"guesses": 3}}))
+    monkeypatch.setattr(c_daemon, "main", fake, raising=False)
+    sent = []
+    message = daemon.handle({"command": "solve", "threads": 2, "calibration": "none"}, sent.append)
+    assert message == {"event": "done", "result": {"word": "chat", "time": 12.5, "guesses": 40, "total_guesses": 300,
+                                                   "strategies": {"best": {"guesses": 3}}}}
+    assert sent == [{"event": "round", "best_score": 12.0}]
+    assert fake.calls[0]["thread_count"] == 2
+    assert fake.calls[0]["calibration"] is None
+    assert daemon.jobs_done == 1
+
+
+def test_invalid_arguments_are_rejected_before_starting(daemon, monkeypatch):
+    fake = stub_main(results=())
+    monkeypatch.setattr(c_daemon, "main", fake, raising=False)
+    assert daemon.handle({"command": "solve", "calibration": "cubic"}, print)["event"] == "error"
+    assert daemon.handle({"command": "benchmark", "budgets": ["greedy"]}, print)["event"] == "error"
+    assert daemon.handle({"command": "benchmark", "calibrations": "curve"}, print)["event"] == "error"
+    assert fake.calls == []
+
+
+def test_failed_solve_reports_an_error(daemon, monkeypatch):
+    monkeypatch.setattr(c_daemon, "main", stub_main(error=RuntimeError("no driver")), raising=False)
+    assert daemon.handle({"command": "solve"}, print) == {"event": "error", "message": "no driver"}
+    monkeypatch.setattr(c_daemon, "main", stub_main(results=[]), raising=False)
+    assert daemon.handle({"command": "solve"}, print)["event"] == "error"
+    assert daemon.jobs_done == 0
+    assert not daemon._job_lock.locked()
+
+
+def test_second_job_rejected_then_cancel(daemon, monkeypatch):
+    running = threading.Event()
+    monkeypatch.setattr(c_daemon, "main", stub_main(block=running), raising=False)
+    messages = []
+    job = threading.Thread(target=lambda: messages.append(daemon.handle({"command": "solve"}, print)))
+    job.start()
+    assert running.wait(5)
+    assert daemon.handle({"command": "status"}, print)["busy"]
+    assert daemon.handle({"command": "benchmark"}, print) == {"event": "error", "message": "A job is already running"}
+    assert daemon.handle({"command": "cancel"}, print) == {"event": "done"}
+    job.join(5)
+    assert messages[0]["event"] == "error"
+    assert not daemon._job_lock.locked()
+
+
+def test_disconnected_client_cancels_the_solve(daemon, monkeypatch):
+    fake = stub_main(block=threading.Event())
+    monkeypatch.setattr(c_daemon, "main", fake, raising=False)
+    def send(data):
+        raise OSError("broken pipe")
+    assert daemon.handle({"command": "solve"}, send)["event"] == "error"
+    assert fake.calls[0]["quit_event"].is_set()
+
+
+def test_request_reads_until_the_final_message():
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            job = json.loads(self.rfile.readline())
+            for message in ({"event": "round", "job": job["command"]}, {"event": "done"}, {"event": "ignored"}):
+                self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+
+    with socketserver.TCPServer(("127.0.0.1", 0), Handler) as server:
+        threading.Thread(target=server.handle_request, daemon=True).start()
+        messages = list(request({"command": "status"}, *server.server_address))
+    assert messages == [{"event": "round", "job": "status"}, {"event": "done"}]
@@ -0,0 +1,75 @@
+import datetime
+import pytest
+pytest.importorskip("selenium")
+import c_pool
+from c_pool import CemantixDriverPool
+
+
+class FakeDriver:
+    started = []
+
+    def __init__(self):
+        self.pages = []
+        self.quitted = False
+        FakeDriver.started.append(self)
+
+    def maximize_window(self):
+        pass
+
+    def get(self, url):
+        self.pages.append(url)
+
+    def quit(self):
+        self.quitted = True
+
+
+class BrokenDriver:
+    def __init__(self):
+        raise RuntimeError("no display")
+
+
+@pytest.fixture
+def firefox(monkeypatch):
+    FakeDriver.started = []
+    monkeypatch.setattr(c_pool.webdriver, "Firefox", FakeDriver)
+    return FakeDriver
+
+
+def test_get_returns_a_warm_driver(firefox):
+    pool = CemantixDriverPool(size=1, url="about:cemantix")
+    pool._start_driver()
+    driver = pool.get()
+    assert driver.pages == ["about:cemantix"]    # not reloaded, the page is from today
+    pool.close()
+
+
+def test_stale_driver_is_reloaded(firefox):
+    pool = CemantixDriverPool(size=1, url="about:cemantix")
+    pool._drivers.put((FakeDriver(), datetime.date.today() - datetime.timedelta(days=1)))
+    driver = pool.get()
+    assert driver.pages == ["about:cemantix"]
+    pool.close()
+
+
+def test_get_falls_back_when_warming_fails(firefox, monkeypatch):
+    pool = CemantixDriverPool(size=1, url="about:cemantix")
+    monkeypatch.setattr(pool, "_refill", lambda count=1: None)
+    monkeypatch.setattr(c_pool.webdriver, "Firefox", BrokenDriver)
+    pool._start_driver()
+    assert pool.ready() == 0
+    monkeypatch.setattr(c_pool.webdriver, "Firefox", FakeDriver)
+    driver = pool.get(timeout=0.1)
+    assert isinstance(driver, FakeDriver)
+    assert driver.pages == ["about:cemantix"]
+
+
+def test_close_quits_waiting_drivers(firefox):
+    pool = CemantixDriverPool(size=2)
+    pool._start_driver()
+    pool._start_driver()
+    pool.close()
+    assert pool.ready() == 0
+    assert all(driver.quitted for driver in firefox.started)
+    pool._start_driver()    # a driver finishing its warm up after the close is quit right away
+    assert firefox.started[-1].quitted
+    assert pool.ready() == 0
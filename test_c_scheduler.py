@@ -0,0 +1,147 @@
+import threading
+import time
+import pytest
+from c_scheduler import CemantixScheduler, SMART, RANDOM
+
+
+def test_burst_then_blocks_until_stop():
+    scheduler = CemantixScheduler(rate=0.01, min_rate=0.01, burst=3)
+    for _ in range(3):
+        assert scheduler.acquire(RANDOM)
+    stop_event = threading.Event()
+    threading.Timer(0.1, stop_event.set).start()
+    assert not scheduler.acquire(RANDOM, stop_event)
+
+
+def test_tokens_refill_at_rate():
+    scheduler = CemantixScheduler(rate=50, burst=1)
+    assert scheduler.acquire(SMART)
+    start = time.monotonic()
+    assert scheduler.acquire(SMART)
+    assert time.monotonic() - start >= 0.015
+
+
+def test_smart_waiting_blocks_random():
+    scheduler = CemantixScheduler(burst=5)
+    scheduler._waiting[SMART] = 1
+    assert not scheduler._can_go(RANDOM)
+    assert scheduler._can_go(SMART)
+    scheduler._waiting[SMART] = 0
+    assert scheduler._can_go(RANDOM)
+
+
+def test_smart_served_before_random():
+    scheduler = CemantixScheduler(rate=20, burst=1)
+    scheduler._tokens = 0
+    order = []
+    random_thread = threading.Thread(target=lambda: scheduler.acquire(RANDOM) and order.append(RANDOM))
+    smart_thread = threading.Thread(target=lambda: scheduler.acquire(SMART) and order.append(SMART))
+    random_thread.start()
+    time.sleep(0.01)
+    smart_thread.start()
+    random_thread.join()
+    smart_thread.join()
+    assert order == [SMART, RANDOM]
+
+
+def test_random_scaled_down_after_threshold():
+    scheduler = CemantixScheduler(rate=20, burst=5, random_threshold=40, random_share=0.25)
+    scheduler.update_best_score(30)
+    assert scheduler.acquire(RANDOM) and scheduler._can_go(RANDOM)
+    scheduler.update_best_score(45)
+    assert scheduler.acquire(RANDOM)
+    assert not scheduler._can_go(RANDOM)
+    assert scheduler._can_go(SMART)
+
+
+def test_random_throughput_drops_with_round_trip_latency():
+    # 3 random solvers bound by a 50ms round trip, the bucket itself is never the limit
+    scheduler = CemantixScheduler(rate=70, burst=10, random_threshold=40, random_share=0.25)
+    stop_event = threading.Event()
+    count = [0]
+    def round_trip():
+        time.sleep(0.05)
+        count[0] += 1
+        return True
+    def worker():
+        while scheduler.submit(RANDOM, round_trip, stop_event=stop_event):
+            pass
+    workers = [threading.Thread(target=worker) for _ in range(3)]
+    for worker_thread in workers: worker_thread.start()
+    time.sleep(1)
+    before = count[0]
+    scheduler.update_best_score(50)
+    time.sleep(0.2)     # let the in flight submissions finish
+    start = count[0]
+    time.sleep(1)
+    after = count[0] - start
+    stop_event.set()
+    for worker_thread in workers: worker_thread.join()
+    assert before > 30
+    assert after < before * 0.5
+    assert scheduler.random_throughput == pytest.approx(before, rel=0.5)
+
+
+def test_update_best_score_keeps_max():
+    scheduler = CemantixScheduler()
+    scheduler.update_best_score(30)
+    scheduler.update_best_score(10)
+    assert scheduler.best_score == 30
+
+
+def test_report_adapts_rate():
+    scheduler = CemantixScheduler(rate=10, min_rate=2, target_latency=0.5)
+    scheduler._token_limited = True
+    scheduler.report(0.1)
+    assert scheduler.rate == pytest.approx(10.05)
+    scheduler.report(1.0)
+    assert scheduler.rate == pytest.approx(10.05 * 0.8)
+    for _ in range(10):
+        scheduler.report(0.1, error=True)
+    assert scheduler.rate == 2
+    assert scheduler.errors == 10
+    assert scheduler.submitted == 12
+
+
+def test_no_increase_when_bucket_is_not_limiting():
+    scheduler = CemantixScheduler(rate=10, burst=5)
+    for _ in range(3):
+        scheduler.submit(SMART, lambda: True)
+    assert scheduler.rate == 10
+    scheduler._tokens = 0
+    assert scheduler.acquire(SMART)     # had to wait for a token
+    scheduler.report(0.1)
+    assert scheduler.rate > 10
+
+
+def test_report_respects_max_rate():
+    scheduler = CemantixScheduler(rate=10, max_rate=10)
+    scheduler._token_limited = True
+    scheduler.report(0.1)
+    assert scheduler.rate == 10
+    uncapped = CemantixScheduler(rate=10, max_rate=None)
+    uncapped._token_limited = True
+    uncapped.report(0.1)
+    assert uncapped.rate > 10
+
+
+def test_submit_reports_missing_answer_and_exceptions():
+    scheduler = CemantixScheduler(rate=10, burst=5)
+    assert scheduler.submit(SMART, lambda: True)
+    assert scheduler.submit(SMART, lambda: False)
+    assert scheduler.errors == 1
+    def broken():
+        raise RuntimeError("driver gone")
+    with pytest.raises(RuntimeError):
+        scheduler.submit(SMART, broken)
+    assert scheduler.errors == 2
+    assert scheduler.submitted == 3
+
+
+def test_submit_skips_function_when_stopped():
+    scheduler = CemantixScheduler()
+    stop_event = threading.Event()
+    stop_event.set()
+    called = []
+    assert scheduler.submit(RANDOM, lambda: called.append(1), stop_event=stop_event) is False
+    assert called == []